@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import argparse
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from models import Stage
+from storage import generate_id, save_db
+from utils.time import ISO_FORMAT
+
+# The catalogue is built in memory (roughly 7 MB per 1k albums before
+# serialisation), so 100k is the largest practical preset.
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+
+WORDS = [
+    "midnight", "golden", "river", "static", "echo", "velvet", "paper", "neon", "ghost", "summer",
+    "broken", "electric", "honey", "silver", "wild", "quiet", "city", "ocean", "fire", "glass",
+    "heart", "machine", "garden", "shadow", "dream", "stone", "blue", "black", "young", "lost",
+]
+FIRST = ["Kendrick", "Bob", "Aretha", "Frank", "Sade", "Thom", "Erykah", "Miles", "Joni", "Tyler", "Fiona", "Andre"]
+LAST = ["Lamar", "Dylan", "Franklin", "Ocean", "Adu", "Yorke", "Badu", "Davis", "Mitchell", "Okonma", "Apple", "Benjamin"]
+GENRES = ["Hip-Hop", "Jazz Rap", "Folk", "Soul", "R&B", "Rock", "Indie", "Electronic", "Pop", "Jazz", "Punk", "Ambient"]
+TAGS = ["classic", "lyrical", "debut", "comeback", "concept", "sample-heavy", "live", "underrated", "political", "summer"]
+PRODUCERS = ["Boi-1da", "KOZ", "Rick Rubin", "Metro Boomin", "Flying Lotus", "Nigel Godrich", "J Dilla", "Madlib", "Pharrell"]
+# Forward path through the state machine; an album at index i has history for 0..i
+PIPELINE = [Stage.IDEATION, Stage.SCRIPTED, Stage.GRAPHICS_READY, Stage.VO_READY, Stage.EDITING, Stage.SCHEDULED, Stage.PUBLISHED, Stage.ARCHIVED]
+EPOCH = datetime(2024, 1, 1)
+
+
+def _title(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).title()
+
+
+def generate_album(rng: random.Random, artists: List[str]) -> Dict:
+    artist = rng.choice(artists)
+    album = _title(rng, rng.randint(1, 4))
+    release = (datetime(1960, 1, 1) + timedelta(days=rng.randrange(65 * 365))).strftime("%Y-%m-%d")
+    tracklist = [
+        {
+            "track_no": i + 1,
+            "title": _title(rng, rng.randint(1, 3)),
+            "rating": round(rng.uniform(3, 10), 1),
+            "duration_sec": rng.randint(90, 420),
+        }
+        for i in range(rng.randint(8, 18))
+    ]
+    created = EPOCH + timedelta(minutes=rng.randrange(500_000))
+    at = created
+    history = [{"from_stage": None, "to_stage": Stage.IDEATION.value, "at": at.strftime(ISO_FORMAT), "note": "Added album"}]
+    for prev, nxt in zip(PIPELINE, PIPELINE[1 : rng.randint(1, len(PIPELINE))]):
+        at += timedelta(hours=rng.randint(1, 72))
+        history.append({"from_stage": prev.value, "to_stage": nxt.value, "at": at.strftime(ISO_FORMAT), "note": ""})
+    return {
+        "id": generate_id(release, artist, album),
+        "artist": artist,
+        "album": album,
+        "release_date": release,
+        "genre": rng.sample(GENRES, rng.randint(1, 3)),
+        "cover_image_path": None,
+        "links": {},
+        "tracklist": tracklist,
+        "favourite_song": rng.choice(tracklist)["title"],
+        "least_favourite_song": rng.choice(tracklist)["title"],
+        "best_moment": _title(rng, 4),
+        "best_production": {"track": rng.choice(tracklist)["title"], "producer": rng.sample(PRODUCERS, rng.randint(1, 2))},
+        "best_feature": {"artist": rng.choice(artists), "track": rng.choice(tracklist)["title"]},
+        "final_score": round(rng.uniform(4, 10), 1),
+        "review_notes": _title(rng, 8),
+        "tags": rng.sample(TAGS, rng.randint(0, 4)),
+        "status": {"stage": history[-1]["to_stage"], "history": history},
+        "timing": {},
+        "assets": {},
+        "audit": {"created_at": created.strftime(ISO_FORMAT), "updated_at": at.strftime(ISO_FORMAT), "updated_by": "bench"},
+    }
+
+
+def generate_catalogue(n: int, seed: int = 0) -> Dict:
+    """Deterministic synthetic database with ``n`` albums."""
+    rng = random.Random(seed)
+    artists = [f"{rng.choice(FIRST)} {rng.choice(LAST)} {i}" for i in range(max(1, n // 8))]
+    albums = []
+    seen = set()
+    for _ in range(n):
+        album = generate_album(rng, artists)
+        base = album["id"]
+        suffix = 2
+        while album["id"] in seen:
+            album["id"] = f"{base}-{suffix}"
+            suffix += 1
+        seen.add(album["id"])
+        albums.append(album)
+    stamp = EPOCH.strftime(ISO_FORMAT)
+    return {"meta": {"version": 1, "created_at": stamp, "updated_at": stamp}, "albums": albums}
+
+
+def parse_size(value: str) -> int:
+    return SIZES.get(value.lower()) or int(value)
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Write a synthetic catalogue database")
+    parser.add_argument("--size", default="1k")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args(argv)
+    save_db(args.out, generate_catalogue(parse_size(args.size), args.seed))
+    print(args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import argparse
+import json
+import platform
+import tempfile
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from benchmarks.generate import generate_catalogue, parse_size
+from models import Album
+from storage import find_album, load_db, save_db
+from tracker import check_db
+from utils.search import filter_albums, search_query
+from utils.time import now_iso
+from exporters.csv_exporter import export_csv
+from exporters.json_exporter import export_canva, export_capcut
+from exporters.md_exporter import export_md
+
+CSV_FIELDS = ["id", "artist", "album", "final_score", "status.stage"]
+# Per-album exporters are timed over this many albums, rewriting one file
+EXPORT_SAMPLE = 1000
+
+
+def per_call(fn: Callable[[], object], repeat: int) -> float:
+    """Best per-call time in seconds over ``repeat`` timing runs.
+
+    One warmup call primes caches, ``autorange`` picks a loop count so each
+    run lasts at least 0.2s (sub-millisecond cases are looped, not timed
+    once) and timeit keeps the garbage collector off while timing."""
+    fn()
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run_size(n: int, repeat: int, seed: int = 0) -> Dict[str, float]:
+    db = generate_catalogue(n, seed)
+    albums = db["albums"]
+    last_id = albums[-1]["id"]
+    query = albums[-1]["album"].split()[0].lower()
+    hydrated = [Album.from_dict(a) for a in albums]
+    sample = albums[:EXPORT_SAMPLE]
+
+    def each(export: Callable[[Dict, str], None], out: str) -> Callable[[], None]:
+        return lambda: [export(a, out) for a in sample]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "database.json")
+        save_db(db_path, db)
+        out = str(Path(tmp) / "out")
+        cases: Dict[str, Callable[[], object]] = {
+            "load_db": lambda: load_db(db_path),
+            "save_db": lambda: save_db(db_path, db),
+            "find_album": lambda: find_album(db, last_id),
+            "filter_albums": lambda: filter_albums(albums, stage="EDITING", tag="classic"),
+            "search_query": lambda: search_query(albums, query),
+            "Album.from_dict": lambda: [Album.from_dict(a) for a in albums],
+            "Album.to_dict": lambda: [a.to_dict() for a in hydrated],
+            "export_csv": lambda: export_csv(albums, CSV_FIELDS, out),
+            "export_canva": each(export_canva, out),
+            "export_capcut": each(export_capcut, out),
+            "export_md": each(export_md, out),
+            "check": lambda: check_db(db),
+        }
+        return {name: per_call(fn, repeat) for name, fn in cases.items()}
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """Return one row per case present in both runs; ``regressed`` is set when
+    the current time exceeds the baseline by more than ``threshold``."""
+    rows = []
+    for size, cases in current["results"].items():
+        for name, seconds in cases.items():
+            base = baseline.get("results", {}).get(size, {}).get(name)
+            if not base:
+                continue
+            ratio = seconds / base
+            rows.append({"size": size, "case": name, "baseline": base, "current": seconds, "ratio": ratio, "regressed": ratio > 1 + threshold})
+    return rows
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark storage, search, models and exporters")
+    parser.add_argument("--sizes", default="1k,10k", help="comma separated: 1k,10k,100k or plain counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, 0.2 = 20%%")
+    args = parser.parse_args(argv)
+
+    current = {
+        "meta": {"created_at": now_iso(), "python": platform.python_version(), "machine": platform.machine(), "repeat": args.repeat, "seed": args.seed},
+        "results": {},
+    }
+    for size in args.sizes.split(","):
+        current["results"][size] = results = run_size(parse_size(size), args.repeat, args.seed)
+        for name, seconds in results.items():
+            print(f"{size:>6}  {name:<16}{seconds * 1000:>12.3f} ms/call")
+
+    if args.save:
+        Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.save).write_text(json.dumps(current, indent=2, sort_keys=True), encoding="utf-8")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        rows = compare(current, baseline, args.threshold)
+        for r in rows:
+            flag = "REGRESSION" if r["regressed"] else ""
+            print(f"{r['size']:>6}  {r['case']:<16}{r['baseline'] * 1000:>12.3f} ->{r['current'] * 1000:>12.3f} ms  x{r['ratio']:.2f}  {flag}")
+        if any(r["regressed"] for r in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
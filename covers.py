@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; only needed when variants must be rendered
+    Image = None
+
+from utils import trace
+from utils.time import now_iso
+
+# "crop" fills the frame and trims the overflow; "fit" letterboxes the whole
+# cover onto a background, which suits square art on vertical video formats.
+VARIANTS: Dict[str, Dict] = {
+    "reels": {"size": [1080, 1920], "mode": "fit", "background": "#000000"},
+    "shorts": {"size": [1080, 1920], "mode": "fit", "background": "#000000"},
+    "tiktok": {"size": [1080, 1920], "mode": "fit", "background": "#000000"},
+    "canva": {"size": [1080, 1080], "mode": "crop"},
+    "thumbnail": {"size": [320, 320], "mode": "crop"},
+}
+OUT_DIR_DEFAULT = "assets/variants"
+HASH_CACHE = ".source-hashes.json"
+
+
+def source_hash(path: Path, cache: Dict[str, list]) -> str:
+    """sha256 of ``path``, reused from ``cache`` while size and mtime match."""
+    st = path.stat()
+    cached = cache.get(str(path))
+    if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+        return cached[2]
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    cache[str(path)] = [st.st_size, st.st_mtime_ns, h.hexdigest()]
+    return h.hexdigest()
+
+
+def variant_path(out_dir: Path, album_id: str, name: str, digest: str) -> Path:
+    spec = json.dumps(VARIANTS[name], sort_keys=True)
+    key = hashlib.sha256(f"{digest}:{name}:{spec}".encode("utf-8")).hexdigest()[:16]
+    return out_dir / album_id / f"{name}-{key}.jpg"
+
+
+def plan(albums: Iterable[Dict], variants: List[str], out_dir: Path, cache: Dict[str, list]) -> Tuple[List[Tuple[str, str, str, str]], List[Tuple[str, str, str]], List[str]]:
+    """Split the work into ``(jobs, cached, missing)``.
+
+    ``jobs`` are ``(album_id, variant, source, output)`` tuples still to render,
+    ``cached`` are ``(album_id, variant, output)`` already on disk and
+    ``missing`` lists album ids whose cover file does not exist."""
+    jobs, cached, missing = [], [], []
+    for a in albums:
+        cover = a.get("cover_image_path")
+        if not cover:
+            continue
+        source = Path(cover)
+        if not source.is_file():
+            missing.append(a["id"])
+            continue
+        digest = source_hash(source, cache)
+        for name in variants:
+            out = variant_path(out_dir, a["id"], name, digest)
+            if out.exists():
+                cached.append((a["id"], name, str(out)))
+            else:
+                jobs.append((a["id"], name, str(source), str(out)))
+    return jobs, cached, missing
+
+
+def render(job: Tuple[str, str, str, str]) -> Tuple[str, str, str]:
+    album_id, name, source, out = job
+    spec = VARIANTS[name]
+    size = tuple(spec["size"])
+    with Image.open(source) as img:
+        img = ImageOps.exif_transpose(img).convert("RGB")
+        if spec["mode"] == "crop":
+            result = ImageOps.fit(img, size, Image.LANCZOS)
+        else:
+            fitted = ImageOps.contain(img, size, Image.LANCZOS)
+            result = Image.new("RGB", size, spec.get("background", "#000000"))
+            result.paste(fitted, ((size[0] - fitted.width) // 2, (size[1] - fitted.height) // 2))
+    Path(out).parent.mkdir(parents=True, exist_ok=True)
+    # Write under a temporary name so an interrupted run never leaves a
+    # partial file that later runs would treat as cached.
+    tmp = Path(out).with_suffix(".tmp")
+    result.save(tmp, "JPEG", quality=90)
+    tmp.replace(out)
+    return album_id, name, out
+
+
+def _remove_superseded(old: Path, out_dir: Path) -> None:
+    # Only delete files this pipeline generated; never touch paths elsewhere
+    if old.resolve().is_relative_to(out_dir.resolve()):
+        old.unlink(missing_ok=True)
+
+
+def _collect(report: Dict[str, list], job: Tuple[str, str, str, str], run) -> None:
+    # One unreadable cover must not abort the batch or lose finished variants
+    try:
+        report["built"].append(run())
+    except Exception as e:
+        report["failed"].append((job[0], job[1], f"{type(e).__name__}: {e}"))
+
+
+def build_assets(db: Dict, variants: List[str], out_dir: str = OUT_DIR_DEFAULT, album_ids: Optional[List[str]] = None, workers: Optional[int] = None, dry_run: bool = False) -> Dict[str, list]:
+    """Render missing cover variants and record their paths in each album's
+    ``assets["variants"]``, deleting the file a new variant supersedes. Returns the built, cached, missing and failed
+    entries; a failed render is reported and the rest of the batch still
+    completes."""
+    unknown = [v for v in variants if v not in VARIANTS]
+    if unknown:
+        raise ValueError(f"unknown variant(s): {', '.join(unknown)}")
+    out = Path(out_dir)
+    albums = db.get("albums", [])
+    if album_ids is not None:
+        wanted = set(album_ids)
+        albums = [a for a in albums if a["id"] in wanted]
+    cache_path = out / HASH_CACHE
+    cache = json.loads(cache_path.read_text(encoding="utf-8")) if cache_path.exists() else {}
+    with trace.phase("assets.plan"):
+        jobs, cached, missing = plan(albums, variants, out, cache)
+    report = {"built": [], "cached": cached, "missing": missing, "failed": [], "pending": jobs}
+    if dry_run:
+        return report
+    if jobs and Image is None:
+        raise RuntimeError("Pillow is required to render cover variants (pip install Pillow)")
+
+    with trace.phase("assets.render"):
+        if len(jobs) > 1 and workers != 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(render, job): job for job in jobs}
+                for future in as_completed(futures):
+                    _collect(report, futures[future], future.result)
+        else:
+            for job in jobs:
+                _collect(report, job, lambda: render(job))
+    trace.count("assets.built", len(report["built"]))
+    trace.count("assets.cached", len(cached))
+    trace.count("assets.failed", len(report["failed"]))
+    report["pending"] = []
+
+    out.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text(json.dumps(cache), encoding="utf-8")
+
+    index = {a["id"]: a for a in albums}
+    for album_id, name, path in [*cached, *report["built"]]:
+        assets = index[album_id].setdefault("assets", {})
+        recorded = assets.setdefault("variants", {})
+        if recorded.get(name) == path:
+            continue
+        old = recorded.get(name)
+        recorded[name] = path
+        if old:
+            _remove_superseded(Path(old), out)
+        if name == "thumbnail":
+            thumbs = [t for t in assets.get("thumbnails", []) if t != old]
+            assets["thumbnails"] = thumbs + [path]
+        # Asset bookkeeping is not a content edit, so audit.updated_at stays put
+        index[album_id].setdefault("audit", {})["assets_updated_at"] = now_iso()
+    return report
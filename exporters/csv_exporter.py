@@ -3,9 +3,11 @@ from __future__ import annotations
 import csv
 from typing import List, Dict
 
+from utils import trace
+
 
 def export_csv(albums: List[Dict], fields: List[str], out_path: str) -> None:
-    with open(out_path, "w", newline="", encoding="utf-8") as f:
+    with trace.phase("export.csv"), open(out_path, "w", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=fields)
         writer.writeheader()
         for album in albums:
@@ -16,3 +18,5 @@ def export_csv(albums: List[Dict], fields: List[str], out_path: str) -> None:
                 else:
                     row[field] = album.get(field)
             writer.writerow(row)
+        trace.count("export.bytes", f.tell())
+        trace.count("export.albums", len(albums))
@@ -3,6 +3,15 @@ from __future__ import annotations
 import json
 from typing import Dict
 
+from utils import trace
+
+
+def _write(data: Dict, out_path: str) -> None:
+    with trace.phase("export.json"), open(out_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        trace.count("export.bytes", f.tell())
+    trace.count("export.albums")
+
 
 def export_canva(album: Dict, out_path: str) -> None:
     data = {
@@ -11,12 +20,11 @@ def export_canva(album: Dict, out_path: str) -> None:
         "Favourite": album.get("favourite_song"),
         "LeastFavourite": album.get("least_favourite_song"),
         "BestMoment": album.get("best_moment"),
-        "BestProduction": album.get("best_production", {}).get("track"),
-        "BestFeature": album.get("best_feature", {}).get("artist"),
+        "BestProduction": (album.get("best_production") or {}).get("track"),
+        "BestFeature": (album.get("best_feature") or {}).get("artist"),
         "FinalScore": str(album.get("final_score")) if album.get("final_score") is not None else None,
     }
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    _write(data, out_path)
 
 
 def export_capcut(album: Dict, out_path: str) -> None:
@@ -25,5 +33,4 @@ def export_capcut(album: Dict, out_path: str) -> None:
         "text_tracklist": ", ".join(t.get("title") for t in album.get("tracklist", [])),
         "text_score": str(album.get("final_score")),
     }
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    _write(data, out_path)
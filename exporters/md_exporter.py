@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from utils import trace
+
 
 def export_md(album: dict, out_path: str) -> None:
     genre_tags = " ".join(f"#{g.replace(' ', '')}" for g in album.get("genre", []))
@@ -11,5 +13,7 @@ def export_md(album: dict, out_path: str) -> None:
         f"Score: {album.get('final_score')}/10\n\n"
         f"#AlbumReview {genre_tags}\n"
     )
-    with open(out_path, "w", encoding="utf-8") as f:
+    with trace.phase("export.md"), open(out_path, "w", encoding="utf-8") as f:
         f.write(content)
+        trace.count("export.bytes", f.tell())
+    trace.count("export.albums")
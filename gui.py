@@ -1,4 +1,5 @@
 import tkinter as tk
+from tkinter import messagebox
 from models import Album, Stage
 from storage import (
     load_db,
@@ -6,7 +7,7 @@ from storage import (
     generate_id,
     upsert_album,
     remove_album,
-    find_album,
+    set_stages,
 )
 from utils.time import now_iso
 
@@ -28,7 +29,7 @@ class TrackerGUI:
             col = tk.Frame(board)
             col.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
             tk.Label(col, text=stage.value).pack()
-            lb = tk.Listbox(col, width=25)
+            lb = tk.Listbox(col, width=25, selectmode=tk.EXTENDED)
             lb.pack(fill=tk.BOTH, expand=True)
             lb.stage = stage  # type: ignore[attr-defined]
             self.listboxes[stage.value] = lb
@@ -52,11 +53,10 @@ class TrackerGUI:
         index = widget.nearest(event.y)
         if index < 0:
             return
-        self.drag_data = {
-            "widget": widget,
-            "index": index,
-            "item": widget.get(index),
-        }
+        # Dragging from inside an existing selection moves the whole selection
+        selected = widget.curselection()
+        indices = selected if index in selected else (index,)
+        self.drag_data = {"items": [widget.get(i) for i in indices]}
 
     def on_drag(self, event: tk.Event) -> None:
         # No visual feedback needed for simple drag operation
@@ -66,34 +66,20 @@ class TrackerGUI:
         if not self.drag_data:
             return
         target = event.widget.winfo_containing(event.x_root, event.y_root)
-        source_widget: tk.Listbox = self.drag_data["widget"]
-        item = self.drag_data["item"]
-        source_widget.delete(self.drag_data["index"])
-        if isinstance(target, tk.Listbox) and hasattr(target, "stage"):
-            target.insert(tk.END, item)
-            self.set_stage(item, target.stage)
-        else:
-            # revert if dropped outside
-            source_widget.insert(self.drag_data["index"], item)
+        items = self.drag_data["items"]
         self.drag_data = None
+        if isinstance(target, tk.Listbox) and hasattr(target, "stage") and target is not event.widget:
+            self.set_stages(items, target.stage)
 
-    def set_stage(self, album_id: str, stage: Stage) -> None:
+    def set_stages(self, album_ids: list[str], stage: Stage) -> None:
         db = load_db(DB_PATH)
-        album = find_album(db, album_id)
-        if not album:
-            return
-        status = album.setdefault("status", {"stage": Stage.IDEATION.value, "history": []})
-        from_stage = status.get("stage", Stage.IDEATION.value)
-        status.setdefault("history", []).append(
-            {
-                "from_stage": from_stage,
-                "to_stage": stage.value,
-                "at": now_iso(),
-                "note": "",
-            }
-        )
-        status["stage"] = stage.value
-        save_db(DB_PATH, db)
+        try:
+            set_stages(db, album_ids, stage)
+        except ValueError as e:
+            messagebox.showerror("Invalid transition", str(e))
+        else:
+            save_db(DB_PATH, db)
+        self.refresh()
 
     def refresh(self) -> None:
         db = load_db(DB_PATH)
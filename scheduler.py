@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import math
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from models import Stage
+from storage import set_stages
+from utils.time import ISO_FORMAT, parse_iso
+
+
+class SlotCalendar:
+    """Per-platform posting cadence.
+
+    Slots for a platform are ``anchor + k * cadence`` for k >= 0. The config
+    lives in ``db["schedule"]["platforms"]`` as
+    ``{"tiktok": {"cadence_hours": 24, "anchor": "2025-01-01T18:00:00Z"}}``."""
+
+    def __init__(self, platforms: Dict[str, Dict]) -> None:
+        self.platforms = platforms
+
+    @classmethod
+    def from_db(cls, db: Dict) -> "SlotCalendar":
+        return cls(db.setdefault("schedule", {}).setdefault("platforms", {}))
+
+    def set_cadence(self, platform: str, cadence_hours: float, anchor: str) -> None:
+        if cadence_hours <= 0:
+            raise ValueError("cadence must be positive")
+        parse_iso(anchor)
+        self.platforms[platform] = {"cadence_hours": cadence_hours, "anchor": anchor}
+
+    def next_free(self, platform: str, after: datetime, taken: Set[datetime]) -> datetime:
+        cfg = self.platforms.get(platform)
+        if cfg is None:
+            raise ValueError(f"no cadence configured for {platform}")
+        anchor = parse_iso(cfg["anchor"])
+        step = timedelta(hours=cfg["cadence_hours"])
+        k = 0 if after <= anchor else math.ceil((after - anchor) / step)
+        slot = anchor + k * step
+        while slot in taken:
+            slot += step
+        return slot
+
+
+class ScheduleQueue:
+    """Min-heap of album ids ordered by planned time, then highest priority.
+
+    ``push`` and ``pop`` are O(log n); ``remove`` marks the entry stale and it
+    is discarded when it reaches the top of the heap."""
+
+    def __init__(self) -> None:
+        self._heap: List[list] = []
+        self._entries: Dict[str, list] = {}
+        self._seq = itertools.count()
+
+    @classmethod
+    def from_albums(cls, albums: Iterable[Dict]) -> "ScheduleQueue":
+        queue = cls()
+        for a in albums:
+            if a.get("status", {}).get("stage") != Stage.SCHEDULED.value:
+                continue
+            timing = a.get("timing") or {}
+            if not timing.get("scheduled_at"):
+                continue
+            entry = [parse_iso(timing["scheduled_at"]), -int(timing.get("priority") or 0), next(queue._seq), a["id"]]
+            queue._entries[a["id"]] = entry
+            queue._heap.append(entry)
+        heapq.heapify(queue._heap)
+        return queue
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def push(self, album_id: str, at: datetime, priority: int = 0) -> None:
+        self.remove(album_id)
+        entry = [at, -priority, next(self._seq), album_id]
+        self._entries[album_id] = entry
+        heapq.heappush(self._heap, entry)
+
+    def remove(self, album_id: str) -> None:
+        entry = self._entries.pop(album_id, None)
+        if entry is not None:
+            entry[-1] = None
+
+    def _drop_stale(self) -> None:
+        while self._heap and self._heap[0][-1] is None:
+            heapq.heappop(self._heap)
+
+    def peek(self) -> Optional[Tuple[datetime, str]]:
+        self._drop_stale()
+        if not self._heap:
+            return None
+        return self._heap[0][0], self._heap[0][-1]
+
+    def pop(self) -> Tuple[datetime, str]:
+        self._drop_stale()
+        at, _, _, album_id = heapq.heappop(self._heap)
+        del self._entries[album_id]
+        return at, album_id
+
+    def pop_due(self, now: datetime) -> List[str]:
+        due: List[str] = []
+        while True:
+            head = self.peek()
+            if head is None or head[0] > now:
+                return due
+            due.append(self.pop()[1])
+
+    def ordered(self) -> List[Tuple[datetime, str]]:
+        return [(e[0], e[-1]) for e in sorted(self._entries.values())]
+
+
+def taken_slots(albums: Iterable[Dict], platform: str) -> Set[datetime]:
+    slots = set()
+    for a in albums:
+        timing = a.get("timing") or {}
+        if timing.get("platform") != platform or not timing.get("scheduled_at"):
+            continue
+        if a.get("status", {}).get("stage") != Stage.SCHEDULED.value:
+            continue
+        slots.add(parse_iso(timing["scheduled_at"]))
+    return slots
+
+
+def schedule_album(db: Dict, album: Dict, platform: str, at: Optional[datetime] = None, priority: int = 0, now: Optional[datetime] = None) -> datetime:
+    """Record a planned release in ``album["timing"]``.
+
+    Only SCHEDULED albums enter the release queue, so any other stage is
+    rejected with ValueError. Without ``at`` the album gets the next free slot
+    on ``platform`` after ``now``."""
+    stage = album.get("status", {}).get("stage", Stage.IDEATION.value)
+    if stage != Stage.SCHEDULED.value:
+        raise ValueError(f"{album['id']} is {stage}; move it to SCHEDULED first")
+    if at is None:
+        others = (a for a in db.get("albums", []) if a is not album)
+        at = SlotCalendar.from_db(db).next_free(platform, now or datetime.utcnow(), taken_slots(others, platform))
+    timing = album.setdefault("timing", {})
+    timing["scheduled_at"] = at.strftime(ISO_FORMAT)
+    timing["platform"] = platform
+    timing["priority"] = priority
+    return at
+
+
+def run_due(db: Dict, now: datetime, dry_run: bool = False) -> List[Dict]:
+    """Move every SCHEDULED album due at ``now`` to PUBLISHED in one batch."""
+    due = ScheduleQueue.from_albums(db.get("albums", [])).pop_due(now)
+    return set_stages(db, due, Stage.PUBLISHED, note="scheduled release", dry_run=dry_run)
+
+
+def next_wait(queue: ScheduleQueue, now: datetime, max_sleep: float) -> float:
+    """Seconds to sleep until the head of ``queue`` is due, capped at
+    ``max_sleep`` so albums scheduled by other processes are noticed."""
+    head = queue.peek()
+    if head is None:
+        return max_sleep
+    return min(max_sleep, max(0.0, (head[0] - now).total_seconds()))
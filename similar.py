@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import zlib
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; queries fall back to a pure Python pass
+    np = None
+
+# Feature layout: HASH_BUCKETS hashed one-hot slots for genre/tag/producer
+# names followed by centred numeric features. Rows are L2-normalised so cosine
+# similarity is a plain dot product.
+HASH_BUCKETS = 64
+NUMERIC = ("final_score", "avg_rating", "release_year")
+DIM = HASH_BUCKETS + len(NUMERIC)
+ROW_BYTES = DIM * 4
+WEIGHTS = {"genre": 1.0, "tag": 0.7, "producer": 0.5}
+
+
+def _bucket(kind: str, value: str) -> int:
+    return zlib.crc32(f"{kind}:{value.strip().lower()}".encode("utf-8")) % HASH_BUCKETS
+
+
+def album_vector(album: Dict) -> array:
+    vec = array("f", bytes(ROW_BYTES))
+    for g in album.get("genre") or []:
+        vec[_bucket("genre", g)] += WEIGHTS["genre"]
+    for t in album.get("tags") or []:
+        vec[_bucket("tag", t)] += WEIGHTS["tag"]
+    for p in (album.get("best_production") or {}).get("producer") or []:
+        vec[_bucket("producer", p)] += WEIGHTS["producer"]
+    score = album.get("final_score")
+    if isinstance(score, (int, float)):
+        vec[HASH_BUCKETS] = (score - 5) / 5
+    ratings = [t["rating"] for t in album.get("tracklist") or [] if t.get("rating") is not None]
+    if ratings:
+        vec[HASH_BUCKETS + 1] = (sum(ratings) / len(ratings) - 5) / 5
+    year = (album.get("release_date") or "")[:4]
+    if year.isdigit() and year != "0000":
+        vec[HASH_BUCKETS + 2] = (int(year) - 1990) / 40
+    norm = math.sqrt(sum(v * v for v in vec))
+    if norm:
+        for i in range(DIM):
+            vec[i] /= norm
+    return vec
+
+
+def feature_stamp(album: Dict) -> str:
+    """Fingerprint of every field ``album_vector`` reads, so a row is
+    re-encoded exactly when its inputs change, however they were edited."""
+    inputs = [
+        album.get("genre") or [],
+        album.get("tags") or [],
+        (album.get("best_production") or {}).get("producer") or [],
+        album.get("final_score"),
+        [t.get("rating") for t in album.get("tracklist") or []],
+        album.get("release_date"),
+    ]
+    return hashlib.blake2b(json.dumps(inputs, default=str).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def index_paths(db_path: str) -> Tuple[Path, Path]:
+    p = Path(db_path)
+    return p.with_name(f"{p.stem}.features.f32"), p.with_name(f"{p.stem}.features.json")
+
+
+def _db_key(db_path: str) -> str:
+    return str(Path(db_path).resolve())
+
+
+def _load_index(meta_path: Path, matrix_path: Path, db_path: str) -> Optional[Dict]:
+    if not meta_path.exists() or not matrix_path.exists():
+        return None
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    if meta.get("dim") != DIM or meta.get("db") != _db_key(db_path) or "stamps" not in meta:
+        return None
+    if matrix_path.stat().st_size != len(meta["ids"]) * ROW_BYTES:
+        return None
+    return meta
+
+
+def refresh_index(db: Dict, db_path: str) -> int:
+    """Bring the on-disk feature matrix up to date with ``db``.
+
+    Only albums whose ``feature_stamp`` changed (or that are new) are
+    re-encoded. Changed rows are rewritten in place and new albums appended;
+    the file is only rebuilt when albums were removed. Returns the number of
+    rows encoded."""
+    matrix_path, meta_path = index_paths(db_path)
+    albums = db.get("albums", [])
+    stamps = {a["id"]: feature_stamp(a) for a in albums}
+    meta = _load_index(meta_path, matrix_path, db_path)
+    encoded = 0
+    rebuilt = False
+
+    if meta is not None and set(meta["ids"]) <= stamps.keys():
+        row_of = {album_id: i for i, album_id in enumerate(meta["ids"])}
+        old_stamps = meta["stamps"]
+        with matrix_path.open("r+b") as f:
+            for a in albums:
+                i = row_of.get(a["id"])
+                if i is not None and old_stamps.get(a["id"]) == stamps[a["id"]]:
+                    continue
+                if i is None:
+                    f.seek(0, 2)
+                    meta["ids"].append(a["id"])
+                else:
+                    f.seek(i * ROW_BYTES)
+                album_vector(a).tofile(f)
+                encoded += 1
+    else:
+        reuse: Dict[str, bytes] = {}
+        if meta is not None:
+            data = matrix_path.read_bytes()
+            for i, album_id in enumerate(meta["ids"]):
+                if album_id in stamps and meta["stamps"].get(album_id) == stamps[album_id]:
+                    reuse[album_id] = data[i * ROW_BYTES : (i + 1) * ROW_BYTES]
+        matrix_path.parent.mkdir(parents=True, exist_ok=True)
+        with matrix_path.open("wb") as f:
+            for a in albums:
+                if a["id"] in reuse:
+                    f.write(reuse[a["id"]])
+                else:
+                    album_vector(a).tofile(f)
+                    encoded += 1
+        meta = {"dim": DIM, "db": _db_key(db_path), "ids": [a["id"] for a in albums]}
+        rebuilt = True
+
+    if encoded or rebuilt:
+        meta["stamps"] = {album_id: stamps[album_id] for album_id in meta["ids"]}
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+    return encoded
+
+
+def most_similar(db_path: str, album_id: str, k: int = 10) -> List[Tuple[str, float]]:
+    """Return the ``k`` albums closest to ``album_id`` by cosine similarity.
+
+    Expects an index written by ``refresh_index``; the matrix is memory-mapped
+    rather than read into memory."""
+    matrix_path, meta_path = index_paths(db_path)
+    meta = _load_index(meta_path, matrix_path, db_path)
+    if meta is None or album_id not in meta["ids"]:
+        raise KeyError(album_id)
+    ids = meta["ids"]
+    row = ids.index(album_id)
+
+    if np is not None:
+        matrix = np.memmap(matrix_path, dtype=np.float32, mode="r", shape=(len(ids), DIM))
+        scores = matrix @ matrix[row]
+        scores[row] = -np.inf
+        k = min(k, len(ids) - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(ids[i], float(scores[i])) for i in top]
+
+    with matrix_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        flat = memoryview(mm).cast("f")
+        try:
+            query = flat[row * DIM : (row + 1) * DIM].tolist()
+            scored = (
+                (sum(q * v for q, v in zip(query, flat[i * DIM : (i + 1) * DIM])), ids[i])
+                for i in range(len(ids))
+                if i != row
+            )
+            top = heapq.nlargest(k, scored, key=lambda s: s[0])
+        finally:
+            flat.release()
+    return [(album, float(score)) for score, album in top]
@@ -2,12 +2,13 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable, List
 from datetime import datetime
 import unicodedata
 import re
 
-from models import Album
+from models import Album, Stage, ALLOWED_TRANSITIONS
+from utils import trace
 
 ISO_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
 
@@ -18,16 +19,25 @@ def load_db(path: str) -> Dict:
         data = {"meta": {"version": 1, "created_at": datetime.utcnow().strftime(ISO_FORMAT), "updated_at": datetime.utcnow().strftime(ISO_FORMAT)}, "albums": []}
         save_db(path, data)
         return data
-    with p.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    with trace.phase("load_db.read"):
+        raw = p.read_bytes()
+    with trace.phase("load_db.parse"):
+        data = json.loads(raw)
+    trace.count("db.bytes_read", len(raw))
+    trace.count("db.albums_loaded", len(data.get("albums", [])))
+    return data
 
 
 def save_db(path: str, data: Dict) -> None:
     p = Path(path)
     p.parent.mkdir(parents=True, exist_ok=True)
     data["meta"]["updated_at"] = datetime.utcnow().strftime(ISO_FORMAT)
-    with p.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, sort_keys=True)
+    with trace.phase("save_db.serialize"):
+        payload = json.dumps(data, indent=2, sort_keys=True)
+    with trace.phase("save_db.write"), p.open("w", encoding="utf-8") as f:
+        f.write(payload)
+    trace.count("db.bytes_written", len(payload))
+    trace.count("db.albums_saved", len(data.get("albums", [])))
 
 
 def slugify(value: str) -> str:
@@ -66,6 +76,49 @@ def remove_album(db: Dict, album_id: str) -> bool:
     return False
 
 
+def set_stages(db: Dict, album_ids: Iterable[str], to: Stage, note: str = "", force: bool = False, dry_run: bool = False) -> List[Dict]:
+    """Move several albums to stage ``to`` in one pass.
+
+    Every transition is checked against ``ALLOWED_TRANSITIONS`` before any
+    album is touched; if one fails a ValueError listing all problems is raised
+    and the database is left unchanged. Albums leaving SCHEDULED lose their
+    ``timing.scheduled_at``/``priority`` booking. Returns one ``{"id", "from_stage",
+    "to_stage"}`` record per album. With ``dry_run`` nothing is mutated."""
+    index = {a["id"]: a for a in db.get("albums", [])}
+    changes: List[Dict] = []
+    errors: List[str] = []
+    for album_id in dict.fromkeys(album_ids):
+        album = index.get(album_id)
+        if album is None:
+            errors.append(f"{album_id}: not found")
+            continue
+        from_stage = Stage(album.get("status", {}).get("stage", Stage.IDEATION.value))
+        if to not in ALLOWED_TRANSITIONS.get(from_stage, set()) and not force:
+            errors.append(f"{album_id}: invalid transition {from_stage.value} -> {to.value}")
+            continue
+        changes.append({"id": album_id, "from_stage": from_stage.value, "to_stage": to.value})
+    if errors:
+        raise ValueError("\n".join(errors))
+    if dry_run:
+        return changes
+    at = datetime.utcnow().strftime(ISO_FORMAT)
+    for change in changes:
+        album = index[change["id"]]
+        status = album.setdefault("status", {"stage": Stage.IDEATION.value, "history": []})
+        status.setdefault("history", []).append(
+            {"from_stage": change["from_stage"], "to_stage": change["to_stage"], "at": at, "note": note}
+        )
+        status["stage"] = change["to_stage"]
+        if change["from_stage"] == Stage.SCHEDULED.value and change["to_stage"] != Stage.SCHEDULED.value:
+            # A booked slot only applies while scheduled; re-entering SCHEDULED
+            # needs a fresh 'schedule add' rather than reviving a stale time.
+            timing = album.get("timing") or {}
+            timing.pop("scheduled_at", None)
+            timing.pop("priority", None)
+        album.setdefault("audit", {})["updated_at"] = at
+    return changes
+
+
 def snapshot(db_path: str) -> Path:
     db = load_db(db_path)
     snap_dir = Path(db_path).parent / "snapshots"
@@ -0,0 +1,22 @@
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from benchmarks.generate import generate_catalogue
+from benchmarks.run import compare
+from tracker import check_db
+
+
+def test_generator_is_deterministic_and_valid():
+    db = generate_catalogue(50, seed=7)
+    assert db == generate_catalogue(50, seed=7)
+    assert len({a["id"] for a in db["albums"]}) == 50
+    assert check_db(db) == []
+
+
+def test_compare_flags_regressions():
+    baseline = {"results": {"1k": {"load_db": 1.0, "save_db": 1.0}}}
+    current = {"results": {"1k": {"load_db": 1.1, "save_db": 1.5, "check": 2.0}}}
+    rows = {r["case"]: r for r in compare(current, baseline, threshold=0.2)}
+    assert not rows["load_db"]["regressed"]
+    assert rows["save_db"]["regressed"]
+    assert "check" not in rows
@@ -26,3 +26,40 @@ def test_cli_set_stage(tmp_path):
     run(["python", "tracker.py", "--db", str(db), "set-stage", "--id", album_id, "--to", "SCRIPTED"])
     data = json.loads(Path(db).read_text())
     assert data["albums"][0]["status"]["stage"] == "SCRIPTED"
+
+
+def test_cli_set_stage_bulk_where(tmp_path):
+    db = tmp_path / "db.json"
+    run(["python", "tracker.py", "--db", str(db), "init"])
+    for name in ("A", "B"):
+        run(["python", "tracker.py", "--db", str(db), "add", "--artist", name, "--album", name])
+    out = run(["python", "tracker.py", "--db", str(db), "set-stage", "--where", "stage=IDEATION", "--to", "SCRIPTED", "--dry-run"])
+    assert "2 album(s) would move" in out
+    assert all(a["status"]["stage"] == "IDEATION" for a in json.loads(Path(db).read_text())["albums"])
+    run(["python", "tracker.py", "--db", str(db), "set-stage", "--where", "stage=IDEATION", "--to", "SCRIPTED"])
+    assert all(a["status"]["stage"] == "SCRIPTED" for a in json.loads(Path(db).read_text())["albums"])
+
+
+def test_cli_dedupe_merges_colliding_ids(tmp_path):
+    db = tmp_path / "db.json"
+    record = {"id": "x", "artist": "A", "album": "B", "status": {"stage": "IDEATION", "history": []}}
+    db.write_text(json.dumps({"meta": {}, "albums": [dict(record), dict(record, final_score=8.0)]}))
+    out = run(["python", "tracker.py", "--db", str(db), "dedupe"])
+    assert "duplicate id: x on 2 records" in out
+    assert all(line.startswith("duplicate id:") for line in out.splitlines())
+    run(["python", "tracker.py", "--db", str(db), "dedupe", "--merge", "x", "x"])
+    albums = json.loads(db.read_text())["albums"]
+    assert len(albums) == 1 and albums[0]["final_score"] == 8.0
+
+
+def test_cli_set_stage_where_validates_stage_and_reports_empty(tmp_path):
+    db = tmp_path / "db.json"
+    run(["python", "tracker.py", "--db", str(db), "add", "--artist", "A", "--album", "A"])
+    before = db.read_text()
+    out = run(["python", "tracker.py", "--db", str(db), "set-stage", "--where", "stage=scripted", "--to", "GRAPHICS_READY"])
+    assert out.strip() == "0 albums matched"
+    assert db.read_text() == before
+    result = subprocess.run(["python", "tracker.py", "--db", str(db), "set-stage", "--where", "stage=bogus", "--to", "SCRIPTED"], capture_output=True, text=True)
+    assert result.returncode != 0 and "invalid stage" in result.stderr
+    run(["python", "tracker.py", "--db", str(db), "set-stage", "--where", "stage=ideation", "--to", "SCRIPTED"])
+    assert json.loads(db.read_text())["albums"][0]["status"]["stage"] == "SCRIPTED"
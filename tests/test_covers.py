@@ -0,0 +1,98 @@
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import pytest
+
+import covers
+from covers import build_assets, plan
+
+
+def make_db(cover):
+    return {"meta": {}, "albums": [{"id": "a", "cover_image_path": str(cover)}, {"id": "b", "cover_image_path": "nope.jpg"}]}
+
+
+def test_cached_variants_are_skipped_and_recorded(tmp_path):
+    cover = tmp_path / "cover.jpg"
+    cover.write_bytes(b"not really a jpeg")
+    out_dir = tmp_path / "variants"
+    db = make_db(cover)
+    jobs, cached, missing = plan(db["albums"], ["canva", "thumbnail"], out_dir, {})
+    assert missing == ["b"] and not cached
+    for _, _, _, out in jobs:
+        pathlib.Path(out).parent.mkdir(parents=True, exist_ok=True)
+        pathlib.Path(out).write_bytes(b"")
+    report = build_assets(db, ["canva", "thumbnail"], str(out_dir))
+    assert not report["built"] and len(report["cached"]) == 2
+    assets = db["albums"][0]["assets"]
+    assert set(assets["variants"]) == {"canva", "thumbnail"}
+    assert assets["thumbnails"] == [assets["variants"]["thumbnail"]]
+    assert "updated_at" not in db["albums"][0].get("audit", {})
+
+
+def test_changed_cover_invalidates_cache(tmp_path):
+    cover = tmp_path / "cover.jpg"
+    cover.write_bytes(b"v1")
+    cache = {}
+    first, _, _ = plan(make_db(cover)["albums"], ["canva"], tmp_path, cache)
+    cover.write_bytes(b"v2-longer")
+    second, _, _ = plan(make_db(cover)["albums"], ["canva"], tmp_path, cache)
+    assert first[0][3] != second[0][3]
+
+
+def test_build_renders_variants(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    cover = tmp_path / "cover.png"
+    Image.new("RGB", (600, 600), "red").save(cover)
+    db = make_db(cover)
+    report = build_assets(db, ["reels", "thumbnail"], str(tmp_path / "variants"), workers=1)
+    assert len(report["built"]) == 2
+    with Image.open(db["albums"][0]["assets"]["variants"]["reels"]) as img:
+        assert img.size == (1080, 1920)
+
+
+def test_failed_render_is_reported_and_others_recorded(tmp_path, monkeypatch):
+    good, bad = tmp_path / "good.jpg", tmp_path / "bad.jpg"
+    good.write_bytes(b"good")
+    bad.write_bytes(b"bad")
+    db = {"meta": {}, "albums": [{"id": "good", "cover_image_path": str(good)}, {"id": "bad", "cover_image_path": str(bad)}]}
+
+    def fake_render(job):
+        if job[0] == "bad":
+            raise OSError("cannot identify image file")
+        return job[0], job[1], job[3]
+
+    monkeypatch.setattr(covers, "Image", object())
+    monkeypatch.setattr(covers, "render", fake_render)
+    report = build_assets(db, ["canva"], str(tmp_path / "variants"), workers=1)
+    assert [f[0] for f in report["failed"]] == ["bad"]
+    assert "canva" in db["albums"][0]["assets"]["variants"]
+    assert "assets" not in db["albums"][1]
+
+
+def test_pool_survives_corrupt_cover(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    good, bad = tmp_path / "good.png", tmp_path / "bad.png"
+    Image.new("RGB", (400, 300), "blue").save(good)
+    bad.write_bytes(b"not an image")
+    db = {"meta": {}, "albums": [{"id": "good", "cover_image_path": str(good)}, {"id": "bad", "cover_image_path": str(bad)}]}
+    report = build_assets(db, ["canva", "thumbnail"], str(tmp_path / "variants"), workers=2)
+    assert len(report["built"]) == 2
+    assert sorted(f[1] for f in report["failed"]) == ["canva", "thumbnail"]
+    assert set(db["albums"][0]["assets"]["variants"]) == {"canva", "thumbnail"}
+
+
+def test_changed_cover_removes_superseded_variant(tmp_path):
+    cover = tmp_path / "cover.jpg"
+    out_dir = tmp_path / "variants"
+    db = make_db(cover)
+    outputs = []
+    for content in (b"v1", b"v2-longer"):
+        cover.write_bytes(content)
+        jobs, _, _ = plan(db["albums"], ["canva"], out_dir, {})
+        out = pathlib.Path(jobs[0][3])
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_bytes(b"")
+        build_assets(db, ["canva"], str(out_dir))
+        outputs.append(out)
+    assert not outputs[0].exists() and outputs[1].exists()
+    assert db["albums"][0]["assets"]["variants"]["canva"] == str(outputs[1])
@@ -0,0 +1,104 @@
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from utils.dedupe import duplicate_ids, find_duplicates, matches_for, merge_albums, merge_same_id, normalize_title, suggest_keep
+
+
+def test_normalize_title_drops_editions_accents_and_article():
+    assert normalize_title("The Wall (2011 Remaster)") == "wall"
+    assert normalize_title("Beyoncé [Deluxe Edition]") == "beyonce"
+    assert normalize_title("Tracks") == "tracks"
+    assert normalize_title("Abbey Road - Remastered 2009") == "abbey road"
+    assert normalize_title("Nevermind (30th Anniversary Edition)") == "nevermind"
+
+
+def test_edition_words_inside_titles_are_kept():
+    assert normalize_title("Super Trouper") == "super trouper"
+    assert normalize_title("Version 2.0") == "version 2 0"
+    assert normalize_title("Special Herbs, Vol. 1") == "special herbs vol 1"
+    assert normalize_title("Super Trouper (Deluxe Edition)") == "super trouper"
+    albums = [{"id": "1980-11-03-abba-super-trouper", "artist": "ABBA", "album": "Super Trouper"}]
+    assert matches_for(albums, "ABBA", "Trouper") == []
+    assert matches_for(albums, "ABBA", "Super Trouper (Deluxe Edition)")[0][1] == 1.0
+
+
+def test_find_duplicates_blocks_by_artist():
+    albums = [
+        {"id": "0000-00-00-pink-floyd-the-wall", "artist": "Pink Floyd", "album": "The Wall"},
+        {"id": "1979-11-30-pink-floyd-the-wall-deluxe", "artist": "The Pink Floyd", "album": "The Wall (Deluxe)"},
+        {"id": "1973-03-01-pink-floyd-dark-side", "artist": "Pink Floyd", "album": "The Dark Side of the Moon"},
+        {"id": "1979-01-01-other-the-wall", "artist": "Other", "album": "The Wall"},
+    ]
+    pairs = find_duplicates(albums)
+    assert [(a, b) for a, b, _ in pairs] == [("0000-00-00-pink-floyd-the-wall", "1979-11-30-pink-floyd-the-wall-deluxe")]
+    assert matches_for(albums, "pink floyd", "Wall")[0][0] == "0000-00-00-pink-floyd-the-wall"
+    keep, drop = suggest_keep(albums[0], {**albums[1], "release_date": "1979-11-30"})
+    assert keep["id"].startswith("1979")
+
+
+def test_merge_combines_tracklists_and_histories():
+    keep = {
+        "id": "a",
+        "tracklist": [{"track_no": 1, "title": "Intro", "rating": None}],
+        "status": {"stage": "SCRIPTED", "history": [{"from_stage": "IDEATION", "to_stage": "SCRIPTED", "at": "2024-01-02T00:00:00Z"}]},
+        "tags": ["classic"],
+    }
+    drop = {
+        "id": "b",
+        "tracklist": [{"track_no": 1, "title": "intro", "rating": 7.0}, {"track_no": 2, "title": "Outro", "rating": 6.0}],
+        "status": {"stage": "IDEATION", "history": [{"from_stage": None, "to_stage": "IDEATION", "at": "2024-01-01T00:00:00Z"}]},
+        "tags": ["debut"],
+        "final_score": 8.0,
+    }
+    merged = merge_albums(keep, drop)
+    assert merged["id"] == "a" and merged["status"]["stage"] == "SCRIPTED"
+    assert [(t["track_no"], t["title"], t["rating"]) for t in merged["tracklist"]] == [(1, "Intro", 7.0), (2, "Outro", 6.0)]
+    assert [h["to_stage"] for h in merged["status"]["history"]] == ["IDEATION", "SCRIPTED"]
+    assert merged["tags"] == ["classic", "debut"] and merged["final_score"] == 8.0
+
+
+def test_same_id_records_merge_by_position():
+    albums = [
+        {"id": "x", "artist": "A", "album": "B", "tracklist": [{"track_no": 1, "title": "One"}]},
+        {"id": "y", "artist": "C", "album": "D"},
+        {"id": "x", "artist": "A", "album": "B", "tracklist": [{"track_no": 1, "title": "Two"}], "final_score": 7.0},
+    ]
+    assert duplicate_ids(albums) == ["x"]
+    assert find_duplicates(albums) == []
+    merged = merge_same_id(albums, "x")
+    assert [a["id"] for a in albums] == ["x", "y"]
+    assert [t["title"] for t in merged["tracklist"]] == ["One", "Two"]
+    assert merged["final_score"] == 7.0
+    assert merge_same_id(albums, "x") is None
+
+
+def test_non_latin_titles_keep_their_letters():
+    assert normalize_title("Группа крови") == "группа крови"
+    albums = [
+        {"id": "1988-01-01-kino-gruppa-krovi", "artist": "Кино", "album": "Группа крови"},
+        {"id": "1988-01-01-kino-gruppa-krovi-remaster", "artist": "Кино", "album": "Группа крови (Remastered)"},
+        {"id": "1990-01-01-ddt-eto-vsyo", "artist": "ДДТ", "album": "Это всё"},
+    ]
+    assert [(a, b) for a, b, _ in find_duplicates(albums)] == [("1988-01-01-kino-gruppa-krovi", "1988-01-01-kino-gruppa-krovi-remaster")]
+    assert matches_for(albums, "ДДТ", "Это всё") == [("1990-01-01-ddt-eto-vsyo", 1.0)]
+    assert matches_for(albums, "ДДТ", "Группа крови") == []
+    assert matches_for(albums, "!!!", "???") == []
+
+
+def test_merge_keeps_non_latin_tracks():
+    keep = {"id": "a", "tracklist": [{"track_no": 1, "title": "無罪"}]}
+    drop = {"id": "b", "tracklist": [{"track_no": 1, "title": "本能"}, {"track_no": 2, "title": "罪と罰"}, {"track_no": 3, "title": "無罪"}]}
+    merged = merge_albums(keep, drop)
+    assert [t["title"] for t in merged["tracklist"]] == ["無罪", "本能", "罪と罰"]
+
+
+def test_numbered_sequels_are_not_duplicates():
+    albums = [
+        {"id": "1969-10-22-led-zeppelin-ii", "artist": "Led Zeppelin", "album": "Led Zeppelin II"},
+        {"id": "1970-10-05-led-zeppelin-iii", "artist": "Led Zeppelin", "album": "Led Zeppelin III"},
+        {"id": "2004-01-01-nujabes-vol-1", "artist": "Nujabes", "album": "Modal Soul Classics, Vol. 1"},
+        {"id": "2005-01-01-nujabes-vol-2", "artist": "Nujabes", "album": "Modal Soul Classics, Vol. 2"},
+    ]
+    assert find_duplicates(albums) == []
+    assert matches_for(albums, "Led Zeppelin", "Led Zeppelin III (Deluxe Edition)") == [("1970-10-05-led-zeppelin-iii", 1.0)]
+    assert matches_for(albums, "Nujabes", "Modal Soul Classics Vol. II")[0][0] == "2005-01-01-nujabes-vol-2"
@@ -0,0 +1,69 @@
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from datetime import datetime
+
+import pytest
+
+from scheduler import ScheduleQueue, SlotCalendar, next_wait, run_due, schedule_album
+from models import Stage
+from storage import find_album, load_db, set_stages, upsert_album
+
+
+def test_queue_orders_by_time_then_priority():
+    q = ScheduleQueue()
+    q.push("late", datetime(2025, 1, 2))
+    q.push("low", datetime(2025, 1, 1), priority=0)
+    q.push("high", datetime(2025, 1, 1), priority=5)
+    q.push("gone", datetime(2024, 1, 1))
+    q.remove("gone")
+    assert q.pop_due(datetime(2025, 1, 1)) == ["high", "low"]
+    assert len(q) == 1
+
+
+def test_schedule_and_run_due(tmp_path):
+    db = load_db(str(tmp_path / "db.json"))
+    SlotCalendar.from_db(db).set_cadence("tiktok", 24, "2025-01-01T18:00:00Z")
+    for album_id in ("a", "b"):
+        upsert_album(db, {"id": album_id, "status": {"stage": "SCHEDULED", "history": []}})
+    now = datetime(2025, 1, 1, 12)
+    assert schedule_album(db, find_album(db, "a"), "tiktok", now=now) == datetime(2025, 1, 1, 18)
+    assert schedule_album(db, find_album(db, "b"), "tiktok", now=now) == datetime(2025, 1, 2, 18)
+    changes = run_due(db, datetime(2025, 1, 1, 20))
+    assert [c["id"] for c in changes] == ["a"]
+    assert find_album(db, "a")["status"]["stage"] == "PUBLISHED"
+    assert find_album(db, "b")["status"]["stage"] == "SCHEDULED"
+
+
+def test_schedule_album_rejects_unscheduled_stage(tmp_path):
+    db = load_db(str(tmp_path / "db.json"))
+    SlotCalendar.from_db(db).set_cadence("tiktok", 24, "2025-01-01T18:00:00Z")
+    upsert_album(db, {"id": "a", "status": {"stage": "EDITING", "history": []}})
+    with pytest.raises(ValueError):
+        schedule_album(db, find_album(db, "a"), "tiktok")
+    assert "scheduled_at" not in find_album(db, "a").get("timing", {})
+
+
+def test_queue_tolerates_null_priority():
+    albums = [{"id": "a", "status": {"stage": "SCHEDULED"}, "timing": {"scheduled_at": "2025-01-01T00:00:00Z", "priority": None}}]
+    assert ScheduleQueue.from_albums(albums).pop_due(datetime(2025, 1, 1)) == ["a"]
+
+
+def test_next_wait_sleeps_until_head_is_due():
+    q = ScheduleQueue()
+    assert next_wait(q, datetime(2025, 1, 1), 3600) == 3600
+    q.push("a", datetime(2025, 1, 1, 0, 10))
+    assert next_wait(q, datetime(2025, 1, 1), 3600) == 600
+    assert next_wait(q, datetime(2025, 1, 1), 60) == 60
+    assert next_wait(q, datetime(2025, 1, 2), 3600) == 0
+
+
+def test_leaving_scheduled_clears_booking(tmp_path):
+    db = load_db(str(tmp_path / "db.json"))
+    upsert_album(db, {"id": "a", "status": {"stage": "SCHEDULED", "history": []}})
+    schedule_album(db, find_album(db, "a"), "tiktok", at=datetime(2025, 1, 1), priority=3)
+    set_stages(db, ["a"], Stage.EDITING)
+    set_stages(db, ["a"], Stage.SCHEDULED)
+    assert "scheduled_at" not in find_album(db, "a")["timing"]
+    assert run_due(db, datetime(2030, 1, 1)) == []
+    assert find_album(db, "a")["status"]["stage"] == "SCHEDULED"
@@ -0,0 +1,76 @@
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import pytest
+
+import similar
+from similar import most_similar, refresh_index
+from storage import load_db, remove_album, upsert_album
+
+
+def album(album_id, genre, tags, stamp="2024-01-01T00:00:00Z"):
+    return {"id": album_id, "genre": genre, "tags": tags, "final_score": 8.0, "audit": {"updated_at": stamp}}
+
+
+def test_similar_ranks_shared_genres_first(tmp_path):
+    db_path = str(tmp_path / "db.json")
+    db = load_db(db_path)
+    upsert_album(db, album("a", ["Hip-Hop", "Jazz Rap"], ["classic"]))
+    upsert_album(db, album("b", ["Hip-Hop", "Jazz Rap"], ["classic"]))
+    upsert_album(db, album("c", ["Folk"], ["lyrical"]))
+    assert refresh_index(db, db_path) == 3
+    assert [album_id for album_id, _ in most_similar(db_path, "a", k=2)] == ["b", "c"]
+
+
+def test_refresh_only_encodes_changed_albums(tmp_path):
+    db_path = str(tmp_path / "db.json")
+    db = load_db(db_path)
+    upsert_album(db, album("a", ["Rock"], []))
+    upsert_album(db, album("b", ["Folk"], []))
+    refresh_index(db, db_path)
+    assert refresh_index(db, db_path) == 0
+    upsert_album(db, album("b", ["Rock"], [], stamp="2024-02-01T00:00:00Z"))
+    upsert_album(db, album("c", ["Rock"], []))
+    assert refresh_index(db, db_path) == 2
+    assert most_similar(db_path, "a", k=1)[0][1] > 0.99
+    remove_album(db, "b")
+    assert refresh_index(db, db_path) == 0
+    assert [album_id for album_id, _ in most_similar(db_path, "a")] == ["c"]
+
+
+def test_track_rating_change_reencodes_row(tmp_path):
+    db_path = str(tmp_path / "db.json")
+    db = load_db(db_path)
+    a = album("a", ["Rock"], [])
+    a["tracklist"] = [{"track_no": 1, "title": "Intro", "rating": 5.0}]
+    upsert_album(db, a)
+    upsert_album(db, album("b", ["Rock"], []))
+    refresh_index(db, db_path)
+    a["tracklist"][0]["rating"] = 9.0
+    assert refresh_index(db, db_path) == 1
+
+
+def test_databases_in_one_directory_do_not_share_an_index(tmp_path):
+    rock, jazz = str(tmp_path / "a.json"), str(tmp_path / "b.json")
+    for path, genre in ((rock, "Rock"), (jazz, "Jazz")):
+        db = load_db(path)
+        upsert_album(db, album("x", [genre], []))
+        upsert_album(db, album("y", ["Rock"], []))
+        refresh_index(db, path)
+    assert most_similar(rock, "x")[0][1] > 0.99
+    assert most_similar(jazz, "x")[0][1] < 0.9
+
+
+def test_numpy_query_matches_fallback(tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    db_path = str(tmp_path / "db.json")
+    db = load_db(db_path)
+    upsert_album(db, album("a", ["Hip-Hop", "Jazz Rap"], ["classic"]))
+    upsert_album(db, album("b", ["Hip-Hop", "Jazz Rap"], ["classic"]))
+    upsert_album(db, album("c", ["Folk"], ["lyrical"]))
+    refresh_index(db, db_path)
+    fast = most_similar(db_path, "a", k=10)
+    monkeypatch.setattr(similar, "np", None)
+    slow = most_similar(db_path, "a", k=10)
+    assert [i for i, _ in fast] == [i for i, _ in slow] == ["b", "c"]
+    assert fast[0][1] == pytest.approx(slow[0][1], abs=1e-5)
@@ -4,7 +4,10 @@ sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
 import json
 from pathlib import Path
 
-from storage import generate_id, load_db, save_db, find_album, upsert_album, remove_album
+import pytest
+
+from models import Stage
+from storage import generate_id, load_db, save_db, find_album, upsert_album, remove_album, set_stages
 
 
 def test_generate_id_slug():
@@ -31,3 +34,15 @@ def test_remove_album(tmp_path):
     removed = remove_album(db, "1")
     assert removed
     assert find_album(db, "1") is None
+
+
+def test_set_stages_validates_all_before_mutating(tmp_path):
+    db = load_db(str(tmp_path / "db.json"))
+    upsert_album(db, {"id": "1", "status": {"stage": "SCHEDULED", "history": []}})
+    upsert_album(db, {"id": "2", "status": {"stage": "EDITING", "history": []}})
+    with pytest.raises(ValueError):
+        set_stages(db, ["1", "2"], Stage.PUBLISHED)
+    assert find_album(db, "1")["status"]["stage"] == "SCHEDULED"
+    changes = set_stages(db, ["1"], Stage.PUBLISHED, note="launch")
+    assert changes == [{"id": "1", "from_stage": "SCHEDULED", "to_stage": "PUBLISHED"}]
+    assert find_album(db, "1")["status"]["history"][-1]["note"] == "launch"
@@ -0,0 +1,31 @@
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import io
+import json
+
+from storage import load_db, save_db
+from utils import trace
+
+
+def test_disabled_hooks_record_nothing(tmp_path):
+    trace.disable()
+    save_db(str(tmp_path / "db.json"), load_db(str(tmp_path / "db.json")))
+    out = io.StringIO()
+    trace.report(out)
+    assert out.getvalue() == ""
+
+
+def test_enabled_records_storage_phases(tmp_path):
+    db_path = str(tmp_path / "db.json")
+    save_db(db_path, {"meta": {}, "albums": [{"id": "1"}]})
+    trace.enable("json")
+    try:
+        load_db(db_path)
+        out = io.StringIO()
+        trace.report(out)
+    finally:
+        trace.disable()
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert {r.get("phase") for r in rows} >= {"load_db.read", "load_db.parse"}
+    assert {"counter": "db.albums_loaded", "value": 1} in rows
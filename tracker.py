@@ -1,16 +1,30 @@
 from __future__ import annotations
 
+import time
+
+_IMPORT_START = time.perf_counter()
+
 import argparse
+import cProfile
+import sys
+from datetime import datetime
 from pathlib import Path
 from typing import List
 
 from models import Album, Track, Stage
-from storage import load_db, save_db, generate_id, find_album, upsert_album, snapshot
-from utils.time import now_iso
+from storage import load_db, save_db, generate_id, find_album, upsert_album, remove_album, set_stages, snapshot
+from scheduler import ScheduleQueue, SlotCalendar, next_wait, run_due, schedule_album
+from similar import most_similar, refresh_index
+from covers import OUT_DIR_DEFAULT, VARIANTS, build_assets
+from utils.time import ISO_FORMAT, now_iso, parse_iso
 from utils.search import filter_albums, search_query
+from utils.dedupe import duplicate_ids, find_duplicates, matches_for, merge_albums, merge_same_id, suggest_keep
 from exporters.csv_exporter import export_csv
 from exporters.json_exporter import export_canva, export_capcut
 from exporters.md_exporter import export_md
+from utils import trace
+
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_START
 
 DB_DEFAULT = "data/database.json"
 
@@ -20,12 +34,17 @@ def cmd_init(args: argparse.Namespace) -> None:
     print(f"initialized {args.db}")
 
 
-def cmd_check(args: argparse.Namespace) -> None:
-    db = load_db(args.db)
+def check_db(db: dict) -> List[str]:
     warnings = []
-    for a in db.get("albums", []):
-        album = Album.from_dict(a)
+    with trace.phase("hydrate"):
+        albums = [Album.from_dict(a) for a in db.get("albums", [])]
+    for album in albums:
         warnings.extend(album.validate())
+    return warnings
+
+
+def cmd_check(args: argparse.Namespace) -> None:
+    warnings = check_db(load_db(args.db))
     if warnings:
         for w in warnings:
             print(w)
@@ -38,6 +57,11 @@ def cmd_add(args: argparse.Namespace) -> None:
     album_id = generate_id(args.release_date or "0000-00-00", args.artist, args.album)
     if find_album(db, album_id):
         raise SystemExit("album exists")
+    if not args.allow_duplicate:
+        matches = matches_for(db.get("albums", []), args.artist, args.album)
+        if matches:
+            other, score = matches[0]
+            raise SystemExit(f"possible duplicate of {other} ({score:.2f}); use --allow-duplicate to add anyway")
     album = Album(
         id=album_id,
         artist=args.artist,
@@ -69,6 +93,7 @@ def cmd_add_track(args: argparse.Namespace) -> None:
         raise SystemExit("not found")
     track = Track(track_no=args.track_no, title=args.title, rating=args.rating, duration_sec=args.duration)
     album.setdefault("tracklist", []).append(track.__dict__)
+    album.setdefault("audit", {})["updated_at"] = now_iso()
     save_db(args.db, db)
 
 
@@ -80,23 +105,48 @@ def cmd_set_track_rating(args: argparse.Namespace) -> None:
     for t in album.get("tracklist", []):
         if t["track_no"] == args.track_no:
             t["rating"] = args.rating
+    album.setdefault("audit", {})["updated_at"] = now_iso()
     save_db(args.db, db)
 
 
+def parse_where(expr: str) -> dict:
+    """Parse ``stage=SCHEDULED,tag=x`` into ``filter_albums`` criteria."""
+    criteria = {}
+    for part in expr.split(","):
+        key, sep, value = part.partition("=")
+        key = key.strip()
+        if not sep or key not in ("stage", "artist", "tag"):
+            raise SystemExit(f"invalid --where clause: {part}")
+        value = value.strip()
+        if key == "stage":
+            if value.upper() not in Stage.__members__:
+                raise SystemExit(f"invalid stage in --where: {value}")
+            value = value.upper()
+        criteria[key] = value
+    return criteria
+
+
 def cmd_set_stage(args: argparse.Namespace) -> None:
     db = load_db(args.db)
-    album = find_album(db, args.id)
-    if not album:
-        raise SystemExit("not found")
-    status = album.setdefault("status", {"stage": Stage.IDEATION.value, "history": []})
-    from_stage = Stage(status.get("stage", "IDEATION"))
-    to_stage = Stage(args.to)
-    allowed = Stage[to_stage.name]
-    from models import ALLOWED_TRANSITIONS
-    if to_stage not in ALLOWED_TRANSITIONS.get(from_stage, set()) and not args.force:
-        raise SystemExit("invalid transition")
-    status["history"].append({"from_stage": from_stage.value, "to_stage": to_stage.value, "at": now_iso(), "note": args.note or ""})
-    status["stage"] = to_stage.value
+    if args.id:
+        ids = [args.id]
+    elif args.ids:
+        ids = args.ids
+    else:
+        ids = [a["id"] for a in filter_albums(db.get("albums", []), **parse_where(args.where))]
+        if not ids:
+            print("0 albums matched")
+            return
+    try:
+        changes = set_stages(db, ids, Stage(args.to), note=args.note or "", force=args.force, dry_run=args.dry_run)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    if len(ids) > 1 or args.dry_run:
+        for c in changes:
+            print(f"{c['id']}: {c['from_stage']} -> {c['to_stage']}")
+    if args.dry_run:
+        print(f"dry run: {len(changes)} album(s) would move")
+        return
     save_db(args.db, db)
 
 
@@ -119,13 +169,26 @@ def cmd_stats(args: argparse.Namespace) -> None:
     album_dict = find_album(db, args.id)
     if not album_dict:
         raise SystemExit("not found")
-    album = Album.from_dict(album_dict)
+    with trace.phase("hydrate"):
+        album = Album.from_dict(album_dict)
     avg = album.average_track_rating()
     top = album.top_track()
     low = album.low_track()
     print({"average": avg, "top": top.title if top else None, "low": low.title if low else None})
 
 
+def cmd_similar(args: argparse.Namespace) -> None:
+    db = load_db(args.db)
+    if not find_album(db, args.id):
+        raise SystemExit("not found")
+    with trace.phase("similar.refresh"):
+        trace.count("similar.rows_encoded", refresh_index(db, args.db))
+    with trace.phase("similar.query"):
+        results = most_similar(args.db, args.id, args.k)
+    for album_id, score in results:
+        print(f"{score:.3f}  {album_id}")
+
+
 def cmd_export(args: argparse.Namespace) -> None:
     db = load_db(args.db)
     if args.format == "csv":
@@ -141,6 +204,129 @@ def cmd_export(args: argparse.Namespace) -> None:
         export_md(album, args.out)
 
 
+def cmd_schedule_cadence(args: argparse.Namespace) -> None:
+    db = load_db(args.db)
+    try:
+        SlotCalendar.from_db(db).set_cadence(args.platform, args.every_hours, args.anchor or now_iso())
+    except ValueError as e:
+        raise SystemExit(str(e))
+    save_db(args.db, db)
+
+
+def cmd_schedule_add(args: argparse.Namespace) -> None:
+    db = load_db(args.db)
+    album = find_album(db, args.id)
+    if not album:
+        raise SystemExit("not found")
+    try:
+        at = schedule_album(db, album, args.platform, parse_iso(args.at) if args.at else None, args.priority)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    album.setdefault("audit", {})["updated_at"] = now_iso()
+    save_db(args.db, db)
+    print(at.strftime(ISO_FORMAT))
+
+
+def cmd_schedule_list(args: argparse.Namespace) -> None:
+    db = load_db(args.db)
+    index = {a["id"]: a for a in db.get("albums", [])}
+    for at, album_id in ScheduleQueue.from_albums(index.values()).ordered()[: args.limit]:
+        timing = index[album_id]["timing"]
+        print(f"{at.strftime(ISO_FORMAT)}  {timing.get('platform', '')}  {timing.get('priority', 0)}  {album_id}")
+
+
+def publish_due(db_path: str, now: datetime, out_dir: str | None, dry_run: bool = False) -> List[dict]:
+    db = load_db(db_path)
+    changes = run_due(db, now, dry_run=dry_run)
+    if changes and not dry_run:
+        save_db(db_path, db)
+        if out_dir:
+            out = Path(out_dir)
+            out.mkdir(parents=True, exist_ok=True)
+            for c in changes:
+                album = find_album(db, c["id"])
+                export_md(album, str(out / f"{c['id']}.md"))
+                export_canva(album, str(out / f"{c['id']}-canva.json"))
+    return changes
+
+
+def cmd_schedule_run_due(args: argparse.Namespace) -> None:
+    now = parse_iso(args.now) if args.now else datetime.utcnow()
+    changes = publish_due(args.db, now, args.out_dir, dry_run=args.dry_run)
+    for c in changes:
+        print(f"{c['id']}: {c['from_stage']} -> {c['to_stage']}")
+    if args.dry_run:
+        print(f"dry run: {len(changes)} album(s) due")
+
+
+def cmd_schedule_daemon(args: argparse.Namespace) -> None:
+    try:
+        while True:
+            for c in publish_due(args.db, datetime.utcnow(), args.out_dir):
+                print(f"{c['id']}: {c['from_stage']} -> {c['to_stage']}", flush=True)
+            queue = ScheduleQueue.from_albums(load_db(args.db).get("albums", []))
+            time.sleep(next_wait(queue, datetime.utcnow(), args.max_sleep))
+    except KeyboardInterrupt:
+        pass
+
+
+def cmd_assets_build(args: argparse.Namespace) -> None:
+    db = load_db(args.db)
+    variants = args.variants.split(",") if args.variants else list(VARIANTS)
+    try:
+        report = build_assets(db, variants, args.out_dir, album_ids=args.ids, workers=args.jobs, dry_run=args.dry_run)
+    except (ValueError, RuntimeError) as e:
+        raise SystemExit(str(e))
+    for album_id in report["missing"]:
+        print(f"{album_id}: cover not found")
+    for album_id, name, error in report["failed"]:
+        print(f"{album_id}: {name} failed ({error})")
+    if args.dry_run:
+        for album_id, name, _, out in report["pending"]:
+            print(f"{album_id}: would build {name} -> {out}")
+        print(f"dry run: {len(report['pending'])} to build, {len(report['cached'])} cached")
+        return
+    save_db(args.db, db)
+    print(f"built {len(report['built'])}, cached {len(report['cached'])}, missing {len(report['missing'])}, failed {len(report['failed'])}")
+
+
+def cmd_dedupe(args: argparse.Namespace) -> None:
+    db = load_db(args.db)
+    albums = db.get("albums", [])
+    if args.merge and args.merge[0] == args.merge[1]:
+        # Same id on several records: merge them by position into the first
+        records = [a for a in albums if a["id"] == args.merge[0]]
+        if len(records) < 2:
+            raise SystemExit(f"{args.merge[0]} is not duplicated")
+        print(f"{args.merge[0]}: merging {len(records)} records")
+        if args.dry_run:
+            return
+        merged = merge_same_id(albums, args.merge[0])
+        merged.setdefault("audit", {})["updated_at"] = now_iso()
+        save_db(args.db, db)
+        return
+    if args.merge:
+        keep, drop = (find_album(db, album_id) for album_id in args.merge)
+        if not keep or not drop:
+            raise SystemExit("not found")
+        merged = merge_albums(keep, drop)
+        merged.setdefault("audit", {})["updated_at"] = now_iso()
+        print(f"{drop['id']} -> {keep['id']}: {len(merged.get('tracklist', []))} tracks, {len(merged['status']['history'])} history entries")
+        if args.dry_run:
+            return
+        remove_album(db, drop["id"])
+        upsert_album(db, merged)
+        save_db(args.db, db)
+        return
+    for album_id in duplicate_ids(albums):
+        count = sum(1 for a in albums if a["id"] == album_id)
+        print(f"duplicate id: {album_id} on {count} records (suggest: dedupe --merge {album_id} {album_id} to combine them)")
+    index = {a["id"]: a for a in albums}
+    for a_id, b_id, score in find_duplicates(albums, args.threshold):
+        keep, drop = suggest_keep(index[a_id], index[b_id])
+        print(f"{score:.2f}  {a_id}  {b_id}  (suggest: dedupe --merge {keep['id']} {drop['id']})")
+
+
 def cmd_snapshot(args: argparse.Namespace) -> None:
     path = snapshot(args.db)
     print(path)
@@ -149,6 +335,9 @@ def cmd_snapshot(args: argparse.Namespace) -> None:
 def main(argv: List[str] | None = None) -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--db", default=DB_DEFAULT)
+    parser.add_argument("--profile", action="store_true", help="print per-phase timings to stderr")
+    parser.add_argument("--profile-format", choices=["table", "json"])
+    parser.add_argument("--profile-dump", help="write cProfile stats for the command to this path")
     sub = parser.add_subparsers(dest="cmd", required=True)
 
     p = sub.add_parser("init")
@@ -163,6 +352,7 @@ def main(argv: List[str] | None = None) -> None:
     p.add_argument("--release-date")
     p.add_argument("--genre")
     p.add_argument("--cover")
+    p.add_argument("--allow-duplicate", action="store_true")
     p.set_defaults(func=cmd_add)
 
     p = sub.add_parser("set-field")
@@ -186,10 +376,14 @@ def main(argv: List[str] | None = None) -> None:
     p.set_defaults(func=cmd_set_track_rating)
 
     p = sub.add_parser("set-stage")
-    p.add_argument("--id", required=True)
+    target = p.add_mutually_exclusive_group(required=True)
+    target.add_argument("--id")
+    target.add_argument("--ids", nargs="+")
+    target.add_argument("--where")
     p.add_argument("--to", required=True)
     p.add_argument("--note")
     p.add_argument("--force", action="store_true")
+    p.add_argument("--dry-run", action="store_true")
     p.set_defaults(func=cmd_set_stage)
 
     p = sub.add_parser("list")
@@ -207,6 +401,11 @@ def main(argv: List[str] | None = None) -> None:
     p.add_argument("--id", required=True)
     p.set_defaults(func=cmd_stats)
 
+    p = sub.add_parser("similar")
+    p.add_argument("--id", required=True)
+    p.add_argument("--k", type=int, default=10)
+    p.set_defaults(func=cmd_similar)
+
     p = sub.add_parser("export")
     p.add_argument("--format", choices=["csv", "json", "md"], required=True)
     p.add_argument("--out", required=True)
@@ -215,11 +414,72 @@ def main(argv: List[str] | None = None) -> None:
     p.add_argument("--id")
     p.set_defaults(func=cmd_export)
 
+    p = sub.add_parser("schedule")
+    schedule_sub = p.add_subparsers(dest="schedule_cmd", required=True)
+
+    sp = schedule_sub.add_parser("cadence")
+    sp.add_argument("--platform", required=True)
+    sp.add_argument("--every-hours", type=float, required=True)
+    sp.add_argument("--anchor")
+    sp.set_defaults(func=cmd_schedule_cadence)
+
+    sp = schedule_sub.add_parser("add")
+    sp.add_argument("--id", required=True)
+    sp.add_argument("--platform", required=True)
+    sp.add_argument("--at")
+    sp.add_argument("--priority", type=int, default=0)
+    sp.set_defaults(func=cmd_schedule_add)
+
+    sp = schedule_sub.add_parser("list")
+    sp.add_argument("--limit", type=int, default=20)
+    sp.set_defaults(func=cmd_schedule_list)
+
+    sp = schedule_sub.add_parser("run-due", aliases=["tick"])
+    sp.add_argument("--now")
+    sp.add_argument("--out-dir")
+    sp.add_argument("--dry-run", action="store_true")
+    sp.set_defaults(func=cmd_schedule_run_due)
+
+    sp = schedule_sub.add_parser("daemon")
+    sp.add_argument("--out-dir")
+    sp.add_argument("--max-sleep", type=float, default=3600)
+    sp.set_defaults(func=cmd_schedule_daemon)
+
+    p = sub.add_parser("assets")
+    assets_sub = p.add_subparsers(dest="assets_cmd", required=True)
+
+    sp = assets_sub.add_parser("build")
+    sp.add_argument("--ids", nargs="+")
+    sp.add_argument("--variants", help=f"comma separated subset of {','.join(VARIANTS)}")
+    sp.add_argument("--out-dir", default=OUT_DIR_DEFAULT)
+    sp.add_argument("--jobs", type=int, help="worker processes (default: CPU count)")
+    sp.add_argument("--dry-run", action="store_true")
+    sp.set_defaults(func=cmd_assets_build)
+
+    p = sub.add_parser("dedupe")
+    p.add_argument("--threshold", type=float, default=0.6)
+    p.add_argument("--merge", nargs=2, metavar=("KEEP_ID", "DROP_ID"))
+    p.add_argument("--dry-run", action="store_true")
+    p.set_defaults(func=cmd_dedupe)
+
     p = sub.add_parser("snapshot")
     p.set_defaults(func=cmd_snapshot)
 
     args = parser.parse_args(argv)
-    args.func(args)
+    if args.profile or args.profile_format:
+        trace.enable(args.profile_format or trace.output_format)
+    trace.record("import", IMPORT_SECONDS)
+    profiler = cProfile.Profile() if args.profile_dump else None
+    try:
+        with trace.phase(f"command.{args.cmd}"):
+            if profiler:
+                profiler.runcall(args.func, args)
+            else:
+                args.func(args)
+    finally:
+        if profiler:
+            profiler.dump_stats(args.profile_dump)
+        trace.report(sys.stderr)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import copy
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Words that mark a re-release of the same record rather than a new one. They
+# are only stripped from bracketed or dash-separated suffixes made up entirely
+# of such words, years and ordinals, e.g. "(Deluxe Edition)", "- 2011 Remaster";
+# "Super Trouper" and "Version 2.0" keep their words.
+EDITION_WORDS = {
+    "deluxe", "edition", "expanded", "remaster", "remastered", "anniversary", "bonus",
+    "version", "special", "super", "explicit", "clean", "reissue", "tracks",
+}
+_BRACKETED = re.compile(r"[(\[]([^()\[\]]*)[)\]]")
+_DASH_SUFFIX = re.compile(r"\s+[-\u2013\u2014:]\s+([^-\u2013\u2014:]*)$")
+# Roman numerals up to 39 ("mix", "civil" and "mid" are not numerals here)
+_ROMAN = re.compile(r"x{0,3}(ix|iv|v?i{0,3})")
+_ROMAN_VALUES = {"i": 1, "v": 5, "x": 10}
+PLACEHOLDER_DATE = "0000-00-00"
+
+
+def _words(value: str) -> List[str]:
+    """Casefolded word tokens with Latin-style accents removed.
+
+    Only the combining diacritics block (U+0300-U+036F) is stripped, so
+    "Beyoncé" matches "Beyonce" and "ё" folds to "е", while non-Latin letters
+    (and marks such as the Japanese dakuten) are kept instead of vanishing."""
+    value = unicodedata.normalize("NFKD", value or "")
+    value = unicodedata.normalize("NFC", "".join(c for c in value if not "\u0300" <= c <= "\u036f"))
+    return re.findall(r"[^\W_]+", value.casefold())
+
+
+def normalize_artist(value: str) -> str:
+    words = _words(value)
+    if len(words) > 1 and words[0] == "the":
+        words = words[1:]
+    return "-".join(words)
+
+
+def _is_edition_suffix(text: str) -> bool:
+    words = _words(text)
+    return bool(words) and all(w in EDITION_WORDS or re.fullmatch(r"\d{4}|\d+(st|nd|rd|th)", w) for w in words)
+
+
+def normalize_title(value: str) -> str:
+    """Casefolded title without a leading "The" or edition suffixes,
+    e.g. "The Wall (2011 Remaster)" -> "wall"."""
+    title = _BRACKETED.sub(lambda m: " " if _is_edition_suffix(m.group(1)) else m.group(0), value or "")
+    while True:
+        m = _DASH_SUFFIX.search(title)
+        if not m or not _is_edition_suffix(m.group(1)):
+            break
+        title = title[: m.start()]
+    words = _words(title) or _words(value)
+    if len(words) > 1 and words[0] == "the":
+        words = words[1:]
+    return " ".join(words)
+
+
+def trigrams(value: str) -> Set[str]:
+    padded = f"  {value} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _roman(word: str) -> int:
+    total = 0
+    for i, c in enumerate(word):
+        v = _ROMAN_VALUES[c]
+        total += -v if i + 1 < len(word) and _ROMAN_VALUES[word[i + 1]] > v else v
+    return total
+
+
+def numbers(title: str) -> Tuple[int, ...]:
+    """Numeric and roman-numeral tokens of a normalised title, so "Vol. 2"
+    and "Vol. II" agree while "II" and "III" do not."""
+    found = []
+    for w in title.split():
+        if w.isdigit():
+            found.append(int(w))
+        elif _ROMAN.fullmatch(w):
+            found.append(_roman(w))
+    return tuple(found)
+
+
+def _similarity(overlap: int, a: int, b: int) -> float:
+    return overlap / (a + b - overlap) if a + b else 0.0
+
+
+def find_duplicates(albums: Iterable[Dict[str, Any]], threshold: float = 0.6) -> List[Tuple[str, str, float]]:
+    """Return ``(id_a, id_b, score)`` pairs of likely duplicate albums.
+
+    Albums are blocked by normalised artist and only compared within a block,
+    using an inverted trigram index so each title is scored only against
+    titles that share at least one trigram. Score is trigram Jaccard
+    similarity of the normalised titles. Albums with an empty artist or
+    title key are never compared, and titles whose numbers differ
+    ("II" vs "III", "Vol. 1" vs "Vol. 2") are treated as different records."""
+    blocks: Dict[str, List[Tuple[Dict[str, Any], str]]] = defaultdict(list)
+    for a in albums:
+        key = normalize_artist(a.get("artist", ""))
+        title = normalize_title(a.get("album", ""))
+        if key and title:
+            blocks[key].append((a, title))
+
+    pairs: List[Tuple[str, str, float]] = []
+    for members in blocks.values():
+        if len(members) < 2:
+            continue
+        index: Dict[str, List[int]] = defaultdict(list)
+        grams: List[Set[str]] = []
+        nums: List[Tuple[int, ...]] = []
+        for i, (a, title) in enumerate(members):
+            g = trigrams(title)
+            overlap: Dict[int, int] = defaultdict(int)
+            for gram in g:
+                for j in index[gram]:
+                    overlap[j] += 1
+                index[gram].append(i)
+            grams.append(g)
+            nums.append(numbers(title))
+            for j, shared in overlap.items():
+                other = members[j][0]
+                # Records sharing an id are reported by duplicate_ids instead
+                if other["id"] == a["id"] or nums[j] != nums[i]:
+                    continue
+                score = _similarity(shared, len(g), len(grams[j]))
+                if score >= threshold:
+                    pairs.append((other["id"], a["id"], round(score, 3)))
+    pairs.sort(key=lambda p: -p[2])
+    return pairs
+
+
+def matches_for(albums: Iterable[Dict[str, Any]], artist: str, album: str, threshold: float = 0.6) -> List[Tuple[str, float]]:
+    """Existing albums that look like ``artist`` / ``album``; used at add time."""
+    key = normalize_artist(artist)
+    title = normalize_title(album)
+    if not key or not title:
+        return []
+    g = trigrams(title)
+    nums = numbers(title)
+    found = []
+    for a in albums:
+        if normalize_artist(a.get("artist", "")) != key:
+            continue
+        other_title = normalize_title(a.get("album", ""))
+        if not other_title or numbers(other_title) != nums:
+            continue
+        other = trigrams(other_title)
+        score = _similarity(len(g & other), len(g), len(other))
+        if score >= threshold:
+            found.append((a["id"], round(score, 3)))
+    found.sort(key=lambda m: -m[1])
+    return found
+
+
+def duplicate_ids(albums: Iterable[Dict[str, Any]]) -> List[str]:
+    seen: Set[str] = set()
+    dupes: List[str] = []
+    for a in albums:
+        if a["id"] in seen and a["id"] not in dupes:
+            dupes.append(a["id"])
+        seen.add(a["id"])
+    return dupes
+
+
+def merge_same_id(albums: List[Dict[str, Any]], album_id: str) -> Optional[Dict[str, Any]]:
+    """Fold every record carrying ``album_id`` into the first one, in list
+    order, and drop the rest from ``albums`` in place. Returns the merged
+    record, or None when the id is not duplicated."""
+    positions = [i for i, a in enumerate(albums) if a["id"] == album_id]
+    if len(positions) < 2:
+        return None
+    merged = albums[positions[0]]
+    for i in positions[1:]:
+        merged = merge_albums(merged, albums[i])
+    albums[positions[0]] = merged
+    for i in reversed(positions[1:]):
+        del albums[i]
+    return merged
+
+
+def suggest_keep(a: Dict[str, Any], b: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Order a duplicate pair as ``(keep, drop)``: prefer a real release date,
+    then the longer stage history, then the longer tracklist."""
+
+    def rank(album: Dict[str, Any]) -> tuple:
+        dated = bool(album.get("release_date")) and not album["id"].startswith(PLACEHOLDER_DATE)
+        return (dated, len(album.get("status", {}).get("history", [])), len(album.get("tracklist", [])))
+
+    return (a, b) if rank(a) >= rank(b) else (b, a)
+
+
+def _track_key(track: Dict[str, Any]) -> str:
+    # Untitled tracks get an empty key and are never treated as the same track
+    title = track.get("title") or ""
+    return normalize_title(title) or title.strip().casefold()
+
+
+def merge_albums(keep: Dict[str, Any], drop: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold ``drop`` into a copy of ``keep``.
+
+    Tracks from ``drop`` whose titles are not already present are appended
+    and renumbered; missing ratings are filled in. Stage histories are
+    combined in timestamp order. Empty scalar fields, genres, tags and links
+    are filled from ``drop``. ``keep``'s id and current stage are kept."""
+    merged = copy.deepcopy(keep)
+    tracks = merged.setdefault("tracklist", [])
+    by_title = {_track_key(t): t for t in tracks if _track_key(t)}
+    next_no = max((t.get("track_no", 0) for t in tracks), default=0) + 1
+    for t in drop.get("tracklist", []):
+        key = _track_key(t)
+        existing = by_title.get(key) if key else None
+        if existing is None:
+            added = dict(t, track_no=next_no)
+            tracks.append(added)
+            if key:
+                by_title[key] = added
+            next_no += 1
+        else:
+            for k in ("rating", "duration_sec"):
+                if existing.get(k) is None and t.get(k) is not None:
+                    existing[k] = t[k]
+
+    status = merged.setdefault("status", {"stage": "IDEATION", "history": []})
+    history = status.get("history", []) + drop.get("status", {}).get("history", [])
+    seen = set()
+    combined = []
+    for h in sorted(history, key=lambda h: h.get("at") or ""):
+        key = (h.get("from_stage"), h.get("to_stage"), h.get("at"))
+        if key not in seen:
+            seen.add(key)
+            combined.append(h)
+    status["history"] = combined
+
+    for field in ("genre", "tags"):
+        merged[field] = list(dict.fromkeys((merged.get(field) or []) + (drop.get(field) or [])))
+    merged["links"] = {**(drop.get("links") or {}), **{k: v for k, v in (merged.get("links") or {}).items() if v}}
+    for field, value in drop.items():
+        if merged.get(field) in (None, "", {}, []) and value not in (None, "", {}, []):
+            merged[field] = copy.deepcopy(value)
+    return merged
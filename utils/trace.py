@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+from contextlib import nullcontext
+from time import perf_counter
+from typing import Dict, List, TextIO
+
+# Phase timings and counters for a single CLI run. Everything here is a cheap
+# no-op until enable() is called (``--profile`` or ``TRACKER_TRACE``), so the
+# hooks can stay on hot paths in storage and the exporters.
+
+enabled = False
+output_format = "table"
+_timings: Dict[str, List[float]] = {}
+_counters: Dict[str, int] = {}
+_NOOP = nullcontext()
+
+
+class _Phase:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> "_Phase":
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        record(self.name, perf_counter() - self.start)
+
+
+def enable(fmt: str = "table") -> None:
+    global enabled, output_format
+    if fmt not in ("table", "json"):
+        raise ValueError(f"unknown trace format {fmt}")
+    enabled = True
+    output_format = fmt
+
+
+def disable() -> None:
+    global enabled
+    enabled = False
+    _timings.clear()
+    _counters.clear()
+
+
+def phase(name: str):
+    """Context manager timing the enclosed block under ``name``."""
+    return _Phase(name) if enabled else _NOOP
+
+
+def record(name: str, seconds: float) -> None:
+    if not enabled:
+        return
+    entry = _timings.setdefault(name, [0.0, 0])
+    entry[0] += seconds
+    entry[1] += 1
+
+
+def count(name: str, n: int = 1) -> None:
+    if enabled:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def report(stream: TextIO | None = None) -> None:
+    if not enabled:
+        return
+    stream = stream or sys.stderr
+    if output_format == "json":
+        for name, (total, calls) in _timings.items():
+            stream.write(json.dumps({"phase": name, "calls": calls, "total_ms": round(total * 1000, 3)}) + "\n")
+        for name, value in _counters.items():
+            stream.write(json.dumps({"counter": name, "value": value}) + "\n")
+        return
+    width = max((len(n) for n in [*_timings, *_counters]), default=5) + 2
+    stream.write(f"{'phase':<{width}}{'calls':>8}{'total_ms':>12}\n")
+    for name, (total, calls) in _timings.items():
+        stream.write(f"{name:<{width}}{calls:>8}{total * 1000:>12.3f}\n")
+    if _counters:
+        stream.write(f"{'counter':<{width}}{'value':>20}\n")
+        for name, value in _counters.items():
+            stream.write(f"{name:<{width}}{value:>20}\n")
+
+
+_env = os.environ.get("TRACKER_TRACE", "").strip().lower()
+if _env and _env not in ("0", "false", "off"):
+    enable("json" if _env == "json" else "table")